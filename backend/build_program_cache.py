@@ -0,0 +1,23 @@
+"""
+Precompute the vectorized program arrays so API workers start without
+re-normalizing every program profile.
+
+Usage (from backend/, at deploy time):
+    python build_program_cache.py
+
+Writes program_profiles.npz and program_profiles_meta.json next to
+program_profiles.json. The API and the match_me CLI rebuild (and rewrite)
+them themselves if they are missing or were built from a different
+program_profiles.json.
+"""
+import os
+
+from match_me import build_program_arrays, load_program_profiles, program_arrays_key, save_program_arrays
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+if __name__ == '__main__':
+    programs, programs_version = load_program_profiles(os.path.join(BASE_DIR, 'program_profiles.json'))
+    save_program_arrays(build_program_arrays(programs), os.path.join(BASE_DIR, 'program_profiles'),
+                        program_arrays_key(programs_version))
+    print(f"Cached arrays for {len(programs)} programs")
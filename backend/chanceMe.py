@@ -23,7 +23,11 @@ def match_ec_strength(user_ecs, notes_series, max_bonus=3):
     total_bonus = min(base_bonus + flexible_bonus, max_bonus)
     return round(total_bonus, 1)
 
-def predict_admission_chance(csv_path, university, program_name, user_avg, user_ecs=None):
+def load_admissions_data(csv_path):
+    """
+    Load and clean the admissions CSV once, returning the offer rows grouped by
+    lowercased university name so predictions don't have to re-read the file.
+    """
     # Load CSV, skip metadata comment line
     df = pd.read_csv(csv_path, skiprows=[1])
     df.columns = df.columns.str.strip()
@@ -32,12 +36,20 @@ def predict_admission_chance(csv_path, university, program_name, user_avg, user_
     df["Top 6 Average"] = pd.to_numeric(df["Top 6 Average"], errors="coerce")
     df = df.dropna(subset=["Top 6 Average"])
 
-    # Match rows by partial (case-insensitive) substring match for program name
-    university_match = df["University"].str.lower() == university.lower()
-    program_match = df["Program name"].str.lower().str.contains(program_name.lower(), regex=False)
-    decision_match = df["Decision"].str.lower() == "offer"
+    # Only offers are used for predictions
+    offers = df[df["Decision"].str.lower() == "offer"].copy()
+    offers["program_lower"] = offers["Program name"].str.lower()
+
+    return {university: group for university, group in offers.groupby(offers["University"].str.lower())}
 
-    offers = df[university_match & program_match & decision_match]
+def predict_admission_chance(admissions, university, program_name, user_avg, user_ecs=None):
+    # Offers for this university (from load_admissions_data)
+    offers = admissions.get(university.lower())
+    if offers is None:
+        return "⚠️ No offer data found for that program."
+
+    # Match rows by partial (case-insensitive) substring match for program name
+    offers = offers[offers["program_lower"].str.contains(program_name.lower(), regex=False, na=False)]
 
     if offers.empty:
         return "⚠️ No offer data found for that program."
@@ -94,4 +106,4 @@ if __name__ == "__main__":
     top6 = 93
     ecs = ["robotics", "student council", "volunteering"]
 
-    print(predict_admission_chance(csv_file, university, program, top6, ecs))
+    print(predict_admission_chance(load_admissions_data(csv_file), university, program, top6, ecs))
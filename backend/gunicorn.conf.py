@@ -0,0 +1,18 @@
+"""
+Gunicorn settings for the UniMe API.
+
+Usage (from backend/):
+    gunicorn -c gunicorn.conf.py api:app
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5001')}"
+
+# compute_matches is CPU-bound, so scale with processes rather than threads
+workers = int(os.environ.get('WEB_CONCURRENCY', 2 * multiprocessing.cpu_count()))
+worker_class = 'sync'
+
+# Load program profiles, mentors and the scoring arrays once in the master;
+# workers share those pages copy-on-write after fork
+preload_app = True
@@ -7,15 +7,21 @@ and then ranks the top 10 university programs from program_profiles.json
 based on their responses.
 
 Usage:
-    pip3 install tqdm
     python3 quiz_cli.py
 
 Outputs the top 10 matches with scores.
 """
 import json
-from tqdm import tqdm
+try:
+    # orjson parses program_profiles.json several times faster than json
+    from orjson import loads as json_loads
+except ImportError:
+    def json_loads(data):
+        return json.loads(bytes(data))
 import sys
+import mmap
 import datetime
+from functools import lru_cache
 from io import BytesIO
 from reportlab.lib.pagesizes import letter, landscape
 from reportlab.lib import colors
@@ -23,11 +29,22 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, Tabl
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 import os
+import hashlib
+import zipfile
+import numpy as np
+from score_numba import score_traits, combine_scores
+
+def load_program_profiles(path):
+    """Parse a program_profiles.json and digest its contents. The file is read
+    through a read-only mmap, so its bytes are never copied into (or kept
+    alive as) a Python bytes object."""
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        with memoryview(m) as view:
+            return json_loads(view), hashlib.blake2b(view, digest_size=16).digest()
 
 # Load program profiles
 try:
-    with open('program_profiles.json', 'r', encoding='utf-8') as f:
-        programs = json.load(f)
+    programs, programs_version = load_program_profiles('program_profiles.json')
 except FileNotFoundError:
     print("Error: program_profiles.json not found. Make sure it exists in this folder.")
     sys.exit(1)
@@ -197,12 +214,42 @@ PROGRAM_TYPE_WEIGHTS = {
     }
 }
 
-# String normalization for consistent matching
+# String normalization for consistent matching. Inputs come from a small, fixed
+# vocabulary (quiz options and program fields), so memoize the results
+_SEPARATORS_TO_SPACE = str.maketrans('-/_', '   ')
+
+@lru_cache(maxsize=8192)
 def normalize_string(s):
     """Normalize strings for comparison by lowercasing and replacing separators"""
     if not s:
         return ""
-    return s.lower().replace('-', ' ').replace('/', ' ').replace('_', ' ').strip()
+    return s.lower().translate(_SEPARATORS_TO_SPACE).strip()
+
+# Mapping matches for one string: the (normalized, original) category of every
+# mapping key it contains, in mapping order. Strings repeat across programs and
+# requests, so scan the mapping keys once per distinct string
+_INTEREST_ITEMS = tuple(INTEREST_MAPPINGS.items())
+_COURSE_ITEMS = tuple(COURSE_MAPPINGS.items())
+
+@lru_cache(maxsize=8192)
+def interest_key_matches(s):
+    return tuple((normalize_string(category), category)
+                 for key_term, category in _INTEREST_ITEMS if key_term in s)
+
+@lru_cache(maxsize=8192)
+def course_key_matches(s):
+    return tuple((normalize_string(category), category)
+                 for key_term, category in _COURSE_ITEMS if key_term in s)
+
+# Program name hints for detect_program_type: (category, hint terms)
+_PROGRAM_NAME_HINTS = (
+    ('Engineering', ('engineering', 'mechanical', 'electrical', 'civil', 'chemical')),
+    ('CS/Math', ('computer', 'software', 'math', 'data science', 'computing')),
+    ('Business', ('business', 'commerce', 'management', 'finance', 'accounting', 'marketing')),
+    ('Arts/Humanities', ('arts', 'humanities', 'english', 'philosophy', 'history', 'music')),
+    ('Sciences', ('science', 'biology', 'chemistry', 'physics', 'environmental')),
+    ('Health', ('health', 'nursing', 'medicine', 'kinesiology', 'pharmacy'))
+)
 
 # Detect program type from interests
 def detect_program_type(program):
@@ -213,23 +260,13 @@ def detect_program_type(program):
     # Count category matches
     category_counts = {}
     for interest in interests:
-        interest_lower = interest.lower()
-        for key_term, category in INTEREST_MAPPINGS.items():
-            if key_term in interest_lower:
-                category_counts[category] = category_counts.get(category, 0) + 1
-                break
+        matches = interest_key_matches(interest.lower())
+        if matches:
+            category = matches[0][1]
+            category_counts[category] = category_counts.get(category, 0) + 1
     
     # Also check program name for hints
-    name_hints = {
-        'Engineering': ['engineering', 'mechanical', 'electrical', 'civil', 'chemical'],
-        'CS/Math': ['computer', 'software', 'math', 'data science', 'computing'],
-        'Business': ['business', 'commerce', 'management', 'finance', 'accounting', 'marketing'],
-        'Arts/Humanities': ['arts', 'humanities', 'english', 'philosophy', 'history', 'music'],
-        'Sciences': ['science', 'biology', 'chemistry', 'physics', 'environmental'],
-        'Health': ['health', 'nursing', 'medicine', 'kinesiology', 'pharmacy']
-    }
-    
-    for category, hints in name_hints.items():
+    for category, hints in _PROGRAM_NAME_HINTS:
         for hint in hints:
             if hint in program_name:
                 category_counts[category] = category_counts.get(category, 0) + 2
@@ -248,13 +285,20 @@ def enhanced_interest_score(user_interests, program_interests):
     # Normalize user interests for comparison
     user_interests_normalized = {normalize_string(i) for i in user_interests}
     
+    return normalized_interest_score(user_interests, user_interests_normalized,
+                                     [normalize_string(i) for i in program_interests])
+
+def normalized_interest_score(user_interests, user_interests_normalized, program_interests_normalized):
+    """enhanced_interest_score on pre-normalized inputs, so callers scoring many
+    programs only normalize each side once"""
+    if not user_interests:
+        return 0
+    
     total_score = 0.0
     max_possible = len(user_interests)
     matched_categories = set()
     
-    for interest in program_interests:
-        interest_normalized = normalize_string(interest)
-        
+    for interest_normalized in program_interests_normalized:
         # Direct match = full points
         if interest_normalized in user_interests_normalized:
             total_score += 1.0
@@ -262,20 +306,18 @@ def enhanced_interest_score(user_interests, program_interests):
             continue
         
         # Try mapped categories with partial credit
-        for key_term, category in INTEREST_MAPPINGS.items():
-            if key_term in interest_normalized:
-                category_normalized = normalize_string(category)
-                if category_normalized in user_interests_normalized:
-                    if category_normalized not in matched_categories:
-                        total_score += 0.75  # Partial credit for category match
-                        matched_categories.add(category_normalized)
-                    break
-                # Check original category name too
-                if category in user_interests:
-                    if category not in matched_categories:
-                        total_score += 0.75
-                        matched_categories.add(category)
-                    break
+        for category_normalized, category in interest_key_matches(interest_normalized):
+            if category_normalized in user_interests_normalized:
+                if category_normalized not in matched_categories:
+                    total_score += 0.75  # Partial credit for category match
+                    matched_categories.add(category_normalized)
+                break
+            # Check original category name too
+            if category in user_interests:
+                if category not in matched_categories:
+                    total_score += 0.75
+                    matched_categories.add(category)
+                break
     
     # Calculate continuous score with diminishing returns for extra matches
     if total_score == 0:
@@ -298,12 +340,18 @@ def enhanced_course_score(user_courses, program_courses):
     # Normalize user courses for comparison
     user_courses_normalized = {normalize_string(c) for c in user_courses}
     
+    return normalized_course_score(user_courses, user_courses_normalized,
+                                   [normalize_string(c) for c in program_courses])
+
+def normalized_course_score(user_courses, user_courses_normalized, program_courses_normalized):
+    """enhanced_course_score on pre-normalized inputs"""
+    if not user_courses or not program_courses_normalized:
+        return 0
+    
     total_score = 0.0
     matched_courses = set()
     
-    for course in program_courses:
-        course_normalized = normalize_string(course)
-        
+    for course_normalized in program_courses_normalized:
         # Direct match = full points
         if course_normalized in user_courses_normalized:
             total_score += 1.0
@@ -311,14 +359,12 @@ def enhanced_course_score(user_courses, program_courses):
             continue
         
         # Try mapped categories with partial credit
-        for key_term, category in COURSE_MAPPINGS.items():
-            if key_term in course_normalized:
-                category_normalized = normalize_string(category)
-                if category_normalized in user_courses_normalized or category in user_courses:
-                    if category_normalized not in matched_courses:
-                        total_score += 0.8  # Good partial credit for category match
-                        matched_courses.add(category_normalized)
-                    break
+        for category_normalized, category in course_key_matches(course_normalized):
+            if category_normalized in user_courses_normalized or category in user_courses:
+                if category_normalized not in matched_courses:
+                    total_score += 0.8  # Good partial credit for category match
+                    matched_courses.add(category_normalized)
+                break
     
     match_ratio = total_score / max(len(user_courses), 1)
     return min(match_ratio, 1.0)  # Cap at 1.0
@@ -520,6 +566,519 @@ def score_social(p, user_answers):
     return (ns_score + spt_score + cl_score + cev_score) / 4
 
 
+# Vectorized scoring: the same scores as score_academic / score_campus /
+# score_social above, computed for every program at once over a
+# struct-of-arrays view of the program profiles
+TRAIT_KEYS = ['learning_style', 'first_year_specialization', 'coop_importance',
+              'research_importance', 'creativity_orientation', 'career_certainty',
+              'math_enjoyment', 'collaboration_preference']
+
+def _categorical_column(values):
+    """Encode a categorical program field as (distinct values, per-program index array)"""
+    positions = {}
+    idx = np.array([positions.setdefault(v, len(positions)) for v in values], dtype=np.intp)
+    return tuple(positions), idx
+
+def _score_table(column, user_options, score_fn):
+    """Score a categorical column against each expected user answer up front,
+    as (user_options, [len(user_options), N] per-program scores)"""
+    values, idx = column
+    scores = np.array([[score_fn(u, v) for v in values] for u in user_options], dtype=float)
+    return tuple(user_options), scores[:, idx]
+
+def _likert_array(values):
+    """Store small-integer Likert answers as int8; fail loudly if the data stops being integral"""
+    arr = np.array(values)
+    if arr.size and not (np.issubdtype(arr.dtype, np.integer) and -128 <= arr.min() and arr.max() <= 127):
+        raise ValueError(f"Likert values must be small integers, got dtype {arr.dtype}")
+    return arr.astype(np.int8)
+
+def _bitmask(flags):
+    """Pack the last axis of a boolean array into little-endian uint64 words"""
+    words = -(-flags.shape[-1] // 64)
+    padded = np.zeros(flags.shape[:-1] + (words * 64,), dtype=bool)
+    padded[..., :flags.shape[-1]] = flags
+    return np.packbits(padded, axis=-1, bitorder='little').view('<u8')
+
+def _term_masks(term_lists):
+    """Encode per-program term sets as a (term -> bit id, [N, words] uint64 bitmask) pair"""
+    term_lists = [set(terms) for terms in term_lists]
+    term_ids = {}
+    for terms in term_lists:
+        for t in terms:
+            term_ids.setdefault(t, len(term_ids))
+    flags = np.zeros((len(term_lists), len(term_ids)), dtype=bool)
+    for row, terms in enumerate(term_lists):
+        flags[row, [term_ids[t] for t in terms]] = True
+    return term_ids, _bitmask(flags)
+
+def _string_matrix(string_lists, key_matches):
+    """Encode ordered per-program string lists for the mapped-match scorers.
+
+    Returns (string -> vocabulary id, mapped categories, [V, C] category-id
+    matrix, [N, L] vocabulary-id matrix); both matrices are padded with -1.
+    Row j of the category-id matrix lists the categories of vocabulary
+    string j's key_matches, in mapping order, as indexes into the
+    (normalized, original) category pairs.
+    """
+    vocab = {}
+    rows = [[vocab.setdefault(s, len(vocab)) for s in strings] for strings in string_lists]
+    ids = np.full((len(rows), max(map(len, rows), default=0)), -1, dtype=np.intp)
+    for row, string_ids in enumerate(rows):
+        ids[row, :len(string_ids)] = string_ids
+
+    category_ids = {}
+    candidates = [[category_ids.setdefault(match, len(category_ids)) for match in key_matches(s)] for s in vocab]
+    candidate_ids = np.full((len(vocab), max(map(len, candidates), default=0) or 1), -1, dtype=np.intp)
+    for row, string_candidates in enumerate(candidates):
+        candidate_ids[row, :len(string_candidates)] = string_candidates
+    return vocab, tuple(category_ids), candidate_ids, ids
+
+def _trait_base_weights(co_high, ur_high, cr_high):
+    """score_academic's base trait weights, in TRAIT_KEYS order"""
+    return np.array([
+        1.2,
+        1.0,
+        1.5 if co_high else 1.0,
+        1.5 if ur_high else 1.0,
+        1.2 if cr_high else 1.0,
+        1.0,
+        1.3,
+        1.0
+    ])
+
+def _trait_weight_flags(user):
+    """Index into the trait weight tables: bit 0 = CO >= 4, bit 1 = UR >= 4, bit 2 = CR >= 4"""
+    return int(user['CO'] >= 4) | int(user['UR'] >= 4) << 1 | int(user['CR'] >= 4) << 2
+
+def _trait_weights(weight_mult):
+    """Per-program trait weights and their sums for every _trait_weight_flags value.
+
+    Returns ([8, N, 8] weights, [8, N] total weights), summed trait by trait
+    like score_academic's sum(weights.values()).
+    """
+    weights = np.stack([_trait_base_weights(flags & 1, flags & 2, flags & 4) * weight_mult
+                        for flags in range(8)])
+    total_weight = np.zeros(weights.shape[:2])
+    for j in range(weights.shape[2]):
+        total_weight += weights[:, :, j]
+    return weights, total_weight
+
+# Answer options of the ordered campus questions
+CLASS_SIZE_ORDER = ["< 60", "60-200", "200+"]
+SETTING_ORDER = ['urban', 'suburban', 'small town', 'rural']
+CAMPUS_SIZE_ORDER = ["Small", "Medium", "Large"]
+
+def build_program_arrays(programs):
+    """Build the struct-of-arrays view of `programs` used by the *_vec scorers"""
+    housing_terms = _term_masks((normalize_string(h) for h in p['campus'].get('housing_styles', []))
+                                 for p in programs)
+    class_size = _categorical_column(p['campus'].get('class_size_bin', '60-200') for p in programs)
+    setting = _categorical_column(normalize_string(p['campus'].get('setting', '')) for p in programs)
+    campus_size = _categorical_column((p['campus'].get('campus_size', 'Medium') or 'Medium').capitalize()
+                                      for p in programs)
+    # Program-type trait multipliers (1.0 for untyped programs), in TRAIT_KEYS order
+    weight_mult = np.array([[PROGRAM_TYPE_WEIGHTS.get(t, {}).get(k, 1.0) for k in TRAIT_KEYS]
+                            for t in map(detect_program_type, programs)]).reshape(len(programs), len(TRAIT_KEYS))
+    trait_weights, trait_total_weight = _trait_weights(weight_mult)
+    prog = {
+        'n': len(programs),
+        'meta': tuple((p['uni'], p['program']) for p in programs),
+        'traits': _likert_array([[p['academic'].get(k, 3) for k in TRAIT_KEYS] for p in programs]),
+        'trait_weights': trait_weights,
+        'trait_total_weight': trait_total_weight,
+        'interests': _string_matrix(((normalize_string(i) for i in p['academic']['interests']) for p in programs),
+                                    interest_key_matches),
+        'courses': _string_matrix(((normalize_string(c) for c in p['academic'].get('liked_hs_courses', []))
+                                   for p in programs), course_key_matches),
+        'alt_terms': _term_masks((normalize_string(a) for a in p['academic'].get('alt_to_engineering', []))
+                                  for p in programs),
+        'housing_terms': housing_terms,
+        'has_housing': housing_terms[1].any(axis=1),
+        'sport_terms': _term_masks((normalize_string(s) for s in p['social'].get('sports', [])) for p in programs),
+        'club_terms': _term_masks((normalize_string(c) for c in p['social'].get('clubs', [])) for p in programs),
+        'class_size': class_size,
+        'setting': setting,
+        'campus_size': campus_size,
+        'night_scene': _likert_array([p['social'].get('night_scene', 3) for p in programs]),
+        'cultural_event_freq': _likert_array([p['social'].get('cultural_event_freq', 3) for p in programs]),
+    }
+    _add_score_tables(prog)
+    return prog
+
+# Fields derived from the categorical columns by the scoring code; they are
+# rebuilt on load rather than cached, so editing the scorers can't leave stale tables
+_SCORE_TABLE_FIELDS = ('class_size_table', 'setting_table', 'campus_size_table')
+
+def _add_score_tables(prog):
+    """Scores for every quiz option (and the unanswered default) of the ordered
+    campus questions; see _table_scores"""
+    prog['class_size_table'] = _score_table(prog['class_size'], CLASS_SIZE_ORDER + [''], _class_size_score)
+    prog['setting_table'] = _score_table(prog['setting'], SETTING_ORDER + [''], _setting_score)
+    prog['campus_size_table'] = _score_table(prog['campus_size'], CAMPUS_SIZE_ORDER, _campus_size_score)
+
+# Bump when build_program_arrays changes shape or meaning, to invalidate saved caches
+PROGRAM_ARRAYS_FORMAT = 6
+
+def program_arrays_key(programs_version):
+    """Identify the build_program_arrays output for a given program_profiles.json
+    (`programs_version` is its digest from load_program_profiles)"""
+    h = hashlib.blake2b(programs_version, digest_size=16)
+    h.update(json.dumps([PROGRAM_ARRAYS_FORMAT, TRAIT_KEYS, INTEREST_MAPPINGS, COURSE_MAPPINGS,
+                         PROGRAM_TYPE_WEIGHTS, _PROGRAM_NAME_HINTS], sort_keys=True).encode())
+    return h.hexdigest()
+
+def save_program_arrays(prog, cache_base, key):
+    """Write `prog` to <cache_base>.npz (arrays) and <cache_base>_meta.json (everything else);
+    the meta file names every field, with None marking the ones stored in the npz"""
+    arrays, meta = {}, {'key': key}
+    for name, value in prog.items():
+        if name in _SCORE_TABLE_FIELDS:
+            continue
+        if isinstance(value, np.ndarray):
+            meta[name] = None
+            arrays[name] = value
+        elif isinstance(value, tuple) and any(isinstance(v, np.ndarray) for v in value):
+            # (lookup, ..., array) tuples from _term_masks / _categorical_column / _string_matrix
+            meta[name] = [None if isinstance(v, np.ndarray) else v for v in value]
+            arrays.update({f'{name}.{i}': v for i, v in enumerate(value) if isinstance(v, np.ndarray)})
+        else:
+            meta[name] = value
+
+    # Write to temp files and rename, so a concurrent loader never sees a partial
+    # file; both files carry the key so a mismatched pair is treated as stale
+    tmp = f'.{os.getpid()}.tmp'
+    with open(f'{cache_base}.npz{tmp}', 'wb') as f:
+        np.savez(f, key=np.array(key), **arrays)
+    with open(f'{cache_base}_meta.json{tmp}', 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    os.replace(f'{cache_base}.npz{tmp}', f'{cache_base}.npz')
+    os.replace(f'{cache_base}_meta.json{tmp}', f'{cache_base}_meta.json')
+
+def _as_tuples(value):
+    """Undo JSON's tuple -> list conversion"""
+    if isinstance(value, list):
+        return tuple(_as_tuples(v) for v in value)
+    return value
+
+def load_program_arrays(cache_base, key):
+    """Read a cache written by save_program_arrays; None if it is missing or stale"""
+    # A truncated or hand-edited cache (a bad zip, a missing member) is treated
+    # like a missing one, so the caller rebuilds it
+    try:
+        with open(f'{cache_base}_meta.json', 'rb') as f:
+            meta = json_loads(f.read())
+        if meta.pop('key', None) != key:
+            return None
+        with np.load(f'{cache_base}.npz') as npz:
+            arrays = {name: npz[name] for name in npz.files}
+        if str(arrays.pop('key', '')) != key:
+            return None
+
+        prog = {}
+        for name, value in meta.items():
+            if value is None:
+                prog[name] = arrays[name]
+            elif isinstance(value, list) and None in value:
+                prog[name] = tuple(arrays[f'{name}.{i}'] if v is None else _as_tuples(v)
+                                   for i, v in enumerate(value))
+            else:
+                prog[name] = _as_tuples(value)
+        _add_score_tables(prog)
+    except (OSError, ValueError, EOFError, KeyError, zipfile.BadZipFile):
+        return None
+    return prog
+
+def get_program_arrays(programs, programs_version, cache_base):
+    """build_program_arrays, reusing the on-disk cache when it matches `programs_version`"""
+    key = program_arrays_key(programs_version)
+    prog = load_program_arrays(cache_base, key)
+    if prog is None:
+        prog = build_program_arrays(programs)
+        try:
+            save_program_arrays(prog, cache_base, key)
+        except OSError as e:
+            print(f"Could not write program array cache: {e}")
+
+    # The arrays are shared by every request, so make accidental in-place edits fail loudly
+    for value in prog.values():
+        for arr in (value if isinstance(value, tuple) else (value,)):
+            if isinstance(arr, np.ndarray):
+                arr.setflags(write=False)
+
+    # Compile the numba kernels now rather than on the first request
+    score_traits(np.full(len(TRAIT_KEYS), 3.0), np.full(len(TRAIT_KEYS), 0.6), prog['traits'][:2],
+                 prog['trait_weights'][0, :2], prog['trait_total_weight'][0, :2])
+    combine_scores(np.zeros((2, 4)), np.zeros((2, 4)), np.zeros((2, 4)), 1.0, 1.0, 1.0, 3.0)
+    return prog
+
+def parse_answers(answers):
+    """Unpack quiz answers (applying defaults) and normalize them once for the *_vec scorers"""
+    user = {
+        'wa': float(answers.get("wa", 1)),
+        'wc': float(answers.get("wc", 1)),
+        'wso': float(answers.get("wso", 1)),
+        'AA': answers.get("AA", []),
+        'LS': int(answers.get("LS", 3)),
+        'SP': int(answers.get("SP", 3)),
+        'CO': int(answers.get("CO", 3)),
+        'UR': int(answers.get("UR", 3)),
+        'CR': int(answers.get("CR", 3)),
+        'CE': int(answers.get("CE", 3)),
+        'LC': answers.get("LC", []),
+        'ME': int(answers.get("ME", 3)),
+        'CP': int(answers.get("CP", 3)),
+        'ALT': answers.get("ALT", []),
+        'CSB': answers.get("CSB", ""),
+        'SET': answers.get("SET", ""),
+        'HS': frozenset(normalize_string(h) for h in answers.get("HS", [])),
+        'CPS': answers.get("CPS", ""),
+        'NS': int(answers.get("NS", 3)),
+        'SPT': frozenset(normalize_string(s) for s in answers.get("SPT", [])),
+        'CLB': frozenset(normalize_string(c) for c in answers.get("CLB", [])),
+        'CEV': int(answers.get("CEV", 3)),
+    }
+    user['W_TOTAL'] = user['wa'] + user['wc'] + user['wso']
+    if user['W_TOTAL'] == 0:
+        # Every total would be 0/0
+        raise ValueError("The academic, campus and social weights must not sum to zero")
+
+    # HS/SPT/CLB are only ever compared normalized, so they are stored that way above; these
+    # answers also keep their raw form (raw lengths and category names are part of the scores)
+    user['AA_NORM'] = frozenset(normalize_string(i) for i in user['AA'])
+    user['LC_NORM'] = frozenset(normalize_string(c) for c in user['LC'])
+    user['ALT_NORM'] = frozenset(normalize_string(a) for a in user['ALT'])
+    user['SET_NORM'] = normalize_string(user['SET']) if user['SET'] else ''
+    user['CPS_NORM'] = user['CPS'].capitalize() if user['CPS'] else 'Medium'
+
+    # Trait answers in TRAIT_KEYS order, with the confidence weight each one carries
+    # (calculate_trait_score_with_confidence's formula, which only depends on the user)
+    trait_vals = np.array([user['LS'], user['SP'], user['CO'], user['UR'],
+                           user['CR'], user['CE'], user['ME'], user['CP']], dtype=float)
+    user['TRAIT_VALS'] = trait_vals
+    user['TRAIT_CONFIDENCE'] = 0.6 + (np.abs(trait_vals - 3) / 2.0) * 0.4
+    user['TRAIT_FLAGS'] = _trait_weight_flags(user)
+    return user
+
+def _score_categorical(column, score_fn):
+    """Score each distinct value of a categorical column once, then gather per program"""
+    values, idx = column
+    return np.array([score_fn(v) for v in values], dtype=float)[idx]
+
+def _overlap_ratio(prog_terms, user_set, denom):
+    """|prog ∩ user| / denom for every program, as an AND + popcount over bitmasks"""
+    term_ids, masks = prog_terms
+    user_flags = np.zeros(len(term_ids), dtype=bool)
+    user_flags[[term_ids[t] for t in user_set if t in term_ids]] = True
+    return np.bitwise_count(masks & _bitmask(user_flags)).sum(axis=1) / denom
+
+def _mapped_match_totals(strings, user_raw, user_norm, partial_credit, raw_category_key):
+    """Per-program (total_score, len(matched)) of normalized_interest_score /
+    normalized_course_score, for every program at once.
+
+    Each vocabulary string is resolved against the user once, through integer
+    vocabulary and category ids: a direct match is worth 1.0, otherwise the
+    first mapped category the user picked is worth `partial_credit` the first
+    time it shows up in a program's matched set. Column sums run left to right so the float totals match the
+    per-program loops exactly.
+    """
+    vocab, categories, candidate_ids, ids = strings
+    key_ids = {}
+
+    # Direct matches. One extra trailing slot so the -1 padding in `ids` gathers "no match"
+    direct = np.zeros(len(vocab) + 1, dtype=bool)
+    direct_key = np.full(len(vocab) + 1, -1, dtype=np.intp)
+    for s in user_norm:
+        j = vocab.get(s)
+        if j is not None:
+            direct[j] = True
+            direct_key[j] = key_ids.setdefault(s, len(key_ids))
+
+    # Which matched-set key (if any) each mapped category credits for this user
+    category_key = np.full(len(categories) + 1, -1, dtype=np.intp)
+    for c, (category_normalized, category) in enumerate(categories):
+        if category_normalized in user_norm:
+            category_key[c] = key_ids.setdefault(category_normalized, len(key_ids))
+        elif category in user_raw:
+            category_key[c] = key_ids.setdefault(raw_category_key(category), len(key_ids))
+
+    # Otherwise a string credits the first of its categories the user picked
+    candidate_keys = category_key[candidate_ids]
+    first_credited = (candidate_keys >= 0).argmax(axis=1)
+    matched_key = np.append(candidate_keys[np.arange(len(vocab)), first_credited], -1)
+    matched_key = np.where(direct, direct_key, matched_key)
+
+    is_direct = direct[ids]
+    keys = matched_key[ids]
+
+    # A key is new to the matched set if no earlier string in the program produced it
+    first_seen = keys >= 0
+    for col in range(1, keys.shape[1]):
+        for prev in range(col):
+            first_seen[:, col] &= keys[:, col] != keys[:, prev]
+
+    credit = np.where(is_direct, 1.0, np.where(first_seen, partial_credit, 0.0))
+    total_score = np.zeros(ids.shape[0])
+    for col in range(credit.shape[1]):
+        total_score += credit[:, col]
+    return total_score, first_seen.sum(axis=1)
+
+def interest_scores_vec(prog, user):
+    """normalized_interest_score for every program"""
+    if not user['AA']:
+        return np.zeros(prog['n'])
+    total_score, n_matched = _mapped_match_totals(prog['interests'], user['AA'], user['AA_NORM'],
+                                                  0.75, lambda category: category)
+    base_score = np.minimum(total_score / len(user['AA']), 1.0)
+    match_bonus = np.minimum(n_matched * 0.05, 0.15)
+    return np.where(total_score == 0, 0.0, np.minimum(base_score + match_bonus, 1.0))
+
+def course_scores_vec(prog, user):
+    """normalized_course_score for every program"""
+    if not user['LC']:
+        return np.zeros(prog['n'])
+    total_score, _ = _mapped_match_totals(prog['courses'], user['LC'], user['LC_NORM'],
+                                          0.8, normalize_string)
+    return np.minimum(total_score / max(len(user['LC']), 1), 1.0)
+
+def academic_parts_vec(prog, user):
+    """score_academic's four weighted components for every program, as an [N, 4] array"""
+    n = prog['n']
+    i_score = interest_scores_vec(prog, user) * 0.4
+    lc_score = course_scores_vec(prog, user) * 0.2
+
+    alt_score = np.zeros(n)
+    if user['ALT']:
+        alt_score = _overlap_ratio(prog['alt_terms'], user['ALT_NORM'], max(len(user['ALT']), 1)) * 0.1
+
+    # Confidence-weighted scoring with the program-type-adjusted weights for this user's flags
+    flags = user['TRAIT_FLAGS']
+    num_score = score_traits(user['TRAIT_VALS'], user['TRAIT_CONFIDENCE'], prog['traits'],
+                             prog['trait_weights'][flags], prog['trait_total_weight'][flags]) * 0.3
+    return np.stack([i_score, lc_score, num_score, alt_score], axis=1)
+
+def _table_scores(table, column, user_value, score_fn):
+    """Per-program scores for `user_value`: its row of a _score_table, or scored
+    directly (once per distinct program value) for answers outside the table"""
+    user_options, scores = table
+    if user_value in user_options:
+        return scores[user_options.index(user_value)]
+    return _score_categorical(column, lambda prog_value: score_fn(user_value, prog_value))
+
+def _class_size_score(user_csb, prog_csb):
+    """Class size score for one user/program pair, as in score_campus"""
+    return score_categorical_distance(user_csb, prog_csb, CLASS_SIZE_ORDER)
+
+def _setting_score(user_setting, prog_setting):
+    """Setting score for one (normalized) user/program pair, as in score_campus"""
+    if user_setting == prog_setting:
+        return 1.0
+
+    user_setting_mapped = user_setting.replace('-', ' ')
+    prog_setting_mapped = prog_setting.replace('-', ' ')
+
+    if user_setting_mapped in SETTING_ORDER and prog_setting_mapped in SETTING_ORDER:
+        return score_categorical_distance(user_setting_mapped, prog_setting_mapped, SETTING_ORDER)
+
+    urban_suburban = {'urban', 'suburban'}
+    rural_small = {'small town', 'rural', 'small-town'}
+
+    if user_setting in urban_suburban and prog_setting in urban_suburban:
+        return 0.6
+    elif user_setting in rural_small and prog_setting in rural_small:
+        return 0.6
+    return 0.2
+
+def _campus_size_score(user_cps, prog_cps):
+    """Campus size score for one (capitalized) user/program pair, as in score_campus"""
+    return score_categorical_distance(user_cps, prog_cps, CAMPUS_SIZE_ORDER)
+
+def campus_parts_vec(prog, user):
+    """score_campus's four components for every program, as an [N, 4] array"""
+    n = prog['n']
+
+    # Class size - using distance-based scoring
+    class_size_score = _table_scores(prog['class_size_table'], prog['class_size'], user['CSB'],
+                                     _class_size_score)
+
+    # Setting - with normalized comparison and distance
+    setting_score = _table_scores(prog['setting_table'], prog['setting'], user['SET_NORM'], _setting_score)
+
+    # Housing style - with normalization
+    user_hs = user['HS']
+    if user_hs:
+        housing_score = np.where(prog['has_housing'],
+                                 _overlap_ratio(prog['housing_terms'], user_hs, len(user_hs)), 0.2)
+    else:
+        housing_score = np.full(n, 0.5)
+
+    # Campus size - using distance-based scoring
+    campus_score = _table_scores(prog['campus_size_table'], prog['campus_size'], user['CPS_NORM'],
+                                 _campus_size_score)
+
+    return np.stack([class_size_score, setting_score, housing_score, campus_score], axis=1)
+
+def social_parts_vec(prog, user):
+    """score_social's four components for every program, as an [N, 4] array"""
+    n = prog['n']
+
+    # Night scene - with confidence weighting
+    ns_score = calculate_trait_score_with_confidence(float(user['NS']), prog['night_scene'])
+
+    # Sports - with normalization
+    user_spt = user['SPT']
+    if "none" in user_spt or not user_spt:
+        spt_score = np.ones(n)
+    else:
+        spt_score = _overlap_ratio(prog['sport_terms'], user_spt, len(user_spt))
+
+    # Clubs - with normalization
+    user_clb = user['CLB']
+    if user_clb:
+        cl_score = _overlap_ratio(prog['club_terms'], user_clb, len(user_clb))
+    else:
+        cl_score = np.full(n, 0.5)
+
+    # Cultural events - with confidence weighting
+    cev_score = calculate_trait_score_with_confidence(float(user['CEV']), prog['cultural_event_freq'])
+
+    return np.stack([ns_score, spt_score, cl_score, cev_score], axis=1)
+
+def score_all_vec(prog, user):
+    """(total, academic, campus, social) for every program, as an [N, 4] array"""
+    return combine_scores(academic_parts_vec(prog, user), campus_parts_vec(prog, user),
+                          social_parts_vec(prog, user), user['wa'], user['wc'], user['wso'],
+                          user['W_TOTAL'])
+
+# PDF paragraph styles, shared by every generate_matches_pdf_bytes call
+PDF_STYLES = getSampleStyleSheet()
+
+PDF_STYLES['Title'].alignment = 1  # Center
+PDF_STYLES['Title'].spaceAfter = 12
+
+# Create a custom subtitle style with a unique name
+PDF_STYLES.add(ParagraphStyle(name='CustomSubtitle', 
+                              parent=PDF_STYLES['Heading2'], 
+                              alignment=1,  # Center
+                              spaceAfter=10))
+
+# Create style for program name cells with wrapping
+PDF_PROGRAM_STYLE = ParagraphStyle(
+    name='ProgramStyle',
+    parent=PDF_STYLES['Normal'],
+    fontSize=9,
+    leading=10,
+    alignment=0,  # Left alignment
+)
+
+PDF_UNIVERSITY_STYLE = ParagraphStyle(
+    name='UniversityStyle',
+    parent=PDF_STYLES['Normal'],
+    fontSize=9,
+    leading=10,
+    alignment=0,  # Left alignment
+)
+
 def generate_matches_pdf_bytes(results, weights=None):
     """
     Generate a PDF with the top 100 program matches and return as bytes
@@ -549,33 +1108,9 @@ def generate_matches_pdf_bytes(results, weights=None):
     # Take top 100 or all results if less than 100
     top_programs = results[:min(100, len(results))]
     
-    styles = getSampleStyleSheet()
-    
-    styles['Title'].alignment = 1  # Center
-    styles['Title'].spaceAfter = 12
-    
-    # Create a custom subtitle style with a unique name
-    styles.add(ParagraphStyle(name='CustomSubtitle', 
-                              parent=styles['Heading2'], 
-                              alignment=1,  # Center
-                              spaceAfter=10))
-    
-    # Create style for program name cells with wrapping
-    program_style = ParagraphStyle(
-        name='ProgramStyle',
-        parent=styles['Normal'],
-        fontSize=9,
-        leading=10,
-        alignment=0,  # Left alignment
-    )
-
-    university_style = ParagraphStyle(
-        name='UniversityStyle',
-        parent=styles['Normal'],
-        fontSize=9,
-        leading=10,
-        alignment=0,  # Left alignment
-    )
+    styles = PDF_STYLES
+    program_style = PDF_PROGRAM_STYLE
+    university_style = PDF_UNIVERSITY_STYLE
     
     # Build content
     content = []
@@ -597,6 +1132,7 @@ def generate_matches_pdf_bytes(results, weights=None):
     
     # Table data with wrapping program text
     table_data = [["Rank", "University", "Program", "Academic", "Campus", "Social", "Total"]]
+    highlights = []
     
     for i, (tot, a, c, soc, uni, prog) in enumerate(top_programs):
         # Convert the program name to a Paragraph object for wrapping
@@ -612,6 +1148,11 @@ def generate_matches_pdf_bytes(results, weights=None):
             f"{soc:.3f}",
             f"{tot:.3f}"
         ])
+        
+        # Highlight academic/campus/social scores above 0.7 as displayed, i.e. rounded to 3 places
+        for col, score in ((3, a), (4, c), (5, soc)):
+            if round(score, 3) > 0.7:
+                highlights.append(('BACKGROUND', (col, i+1), (col, i+1), colors.palegreen))
     
     # Create the table with column widths
     col_widths = [30, 110, 200, 60, 60, 60, 60]  # Adjust column widths
@@ -642,31 +1183,10 @@ def generate_matches_pdf_bytes(results, weights=None):
     ]
     
     # Add alternating row backgrounds
-    for row in range(1, len(table_data), 2):
-        style.append(('BACKGROUND', (0, row), (-1, row), colors.lightgrey))
+    style.extend(('BACKGROUND', (0, row), (-1, row), colors.lightgrey) for row in range(1, len(table_data), 2))
     
     # Add conditional formatting for high scores
-    for row in range(1, len(table_data)):
-        # Academic score highlighting
-        try:
-            if float(table_data[row][3]) > 0.7:
-                style.append(('BACKGROUND', (3, row), (3, row), colors.palegreen))
-        except (ValueError, TypeError):
-            pass
-        
-        # Campus score highlighting
-        try:
-            if float(table_data[row][4]) > 0.7:
-                style.append(('BACKGROUND', (4, row), (4, row), colors.palegreen))
-        except (ValueError, TypeError):
-            pass
-        
-        # Social score highlighting
-        try:
-            if float(table_data[row][5]) > 0.7:
-                style.append(('BACKGROUND', (5, row), (5, row), colors.palegreen))
-        except (ValueError, TypeError):
-            pass
+    style.extend(highlights)
     
     table.setStyle(TableStyle(style))
     content.append(table)
@@ -678,20 +1198,36 @@ def generate_matches_pdf_bytes(results, weights=None):
     buffer.seek(0)
     return buffer
 
+# The array cache lives next to this module (as for the API), whatever the working directory
+PROGRAM_CACHE_BASE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'program_profiles')
+
+@lru_cache(maxsize=1)
+def _program_arrays():
+    """Struct-of-arrays view of `programs`, loaded (or built and cached) on first use"""
+    return get_program_arrays(programs, programs_version, PROGRAM_CACHE_BASE)
+
+def top_indices(total, k=None):
+    """Indices of the k highest scores (all of them if k is None), best first;
+    tied scores keep program order, and NaN scores rank last"""
+    if k is None or not 0 < k < len(total):
+        return np.argsort(-total, kind='stable')[:k]
+    # O(N) partition to find the k-th best score, then sort only the scores at
+    # least that good (all ties included, so the cut matches a full stable sort)
+    kth_best = -np.partition(-total, k - 1)[k - 1]
+    if np.isnan(kth_best):
+        # Fewer than k real scores: the NaN rows fill the rest, as in the full sort
+        return np.argsort(-total, kind='stable')[:k]
+    candidates = np.flatnonzero(total >= kth_best)
+    return candidates[np.argsort(-total[candidates], kind='stable')][:k]
+
 # Compute and rank
-def compute_matches(user_answers):
-    results = []
-    for p in tqdm(programs, desc="Scoring programs"):
-        try:
-            a = score_academic(p, user_answers)
-            c = score_campus(p, user_answers)
-            sos = score_social(p, user_answers)
-            total = (user_answers['wa']*a + user_answers['wc']*c + user_answers['wso']*sos) / (user_answers['W_TOTAL'] or 1)
-            results.append((total, a, c, sos, p['uni'], p['program']))
-        except Exception as e:
-            print(f"Error scoring {p.get('uni', 'Unknown')} - {p.get('program', 'Unknown')}: {e}")
-
-    results.sort(reverse=True, key=lambda x: x[0])
-    return results
+def compute_matches(user_answers, top_k=100):
+    """The top_k best matches (every program if top_k is None) as
+    (total, academic, campus, social, university, program) tuples, best first"""
+    prog = _program_arrays()
+    scores = score_all_vec(prog, parse_answers(user_answers))
+    top = top_indices(scores[:, 0], top_k)
+    # One gather + tolist for all the kept rows instead of converting row by row
+    return [tuple(row) + prog['meta'][i] for i, row in zip(top.tolist(), scores[top].tolist())]
 
 print("\nDone.")
@@ -0,0 +1,102 @@
+"""
+Numba kernels for the vectorized program scorers in match_me.py.
+
+Each kernel has a plain NumPy twin with the same signature, used when
+numba is not installed so the API still runs (just slower).
+
+The kernels are serial: a pass is ~1400 programs, and the API scales with
+gunicorn worker processes, so numba threads would only add fork and
+thread-safety concerns.
+"""
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def _score_traits_numpy(user_vals, confidence_weight, prog_vals, weights, total_weight):
+    """Weighted average of the confidence-weighted trait similarity, per program"""
+    similarity = 1 - np.abs(prog_vals - user_vals) / 4.0
+    weighted = similarity * confidence_weight * weights
+
+    # Accumulate trait by trait (not ndarray.sum's pairwise order) so the
+    # floats match the per-program loop in match_me.score_academic
+    weighted_sum = np.zeros(len(prog_vals))
+    for j in range(weights.shape[1]):
+        weighted_sum += weighted[:, j]
+    return weighted_sum / total_weight
+
+
+def _combine_scores_numpy(academic_parts, campus_parts, social_parts, wa, wc, wso, w_total):
+    """(total, academic, campus, social) per program, from each category's component columns"""
+    n_programs = len(academic_parts)
+    academic = np.zeros(n_programs)
+    for j in range(academic_parts.shape[1]):
+        academic += academic_parts[:, j]
+    campus = np.zeros(n_programs)
+    for j in range(campus_parts.shape[1]):
+        campus += campus_parts[:, j]
+    campus /= campus_parts.shape[1]
+    social = np.zeros(n_programs)
+    for j in range(social_parts.shape[1]):
+        social += social_parts[:, j]
+    social /= social_parts.shape[1]
+    total = (wa*academic + wc*campus + wso*social) / w_total
+    return np.stack([total, academic, campus, social], axis=1)
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def score_traits(user_vals, confidence_weight, prog_vals, weights, total_weight):
+        """Weighted average of the confidence-weighted trait similarity, per program
+
+        Same arithmetic as match_me.calculate_trait_score_with_confidence,
+        inlined so the whole [N, 8] pass runs in one compiled loop; the
+        per-trait confidence weights only depend on the user, so they come
+        precomputed from match_me.parse_answers. No fastmath: reassociating
+        the sums would change the low bits and with them the order of
+        near-tied programs.
+        """
+        n_programs, n_traits = prog_vals.shape
+        out = np.empty(n_programs)
+        for i in range(n_programs):
+            weighted_sum = 0.0
+            for j in range(n_traits):
+                similarity = 1.0 - abs(prog_vals[i, j] - user_vals[j]) / 4.0
+                weighted_sum += similarity * confidence_weight[j] * weights[i, j]
+            out[i] = weighted_sum / total_weight[i]
+        return out
+
+    @njit(cache=True)
+    def combine_scores(academic_parts, campus_parts, social_parts, wa, wc, wso, w_total):
+        """(total, academic, campus, social) per program, from each category's component columns
+
+        The academic sum, the campus/social averages and the weighted total
+        are fused into one pass over the programs, summing in the same order
+        as match_me.score_academic / score_campus / score_social.
+        """
+        n_programs = academic_parts.shape[0]
+        out = np.empty((n_programs, 4))
+        for i in range(n_programs):
+            academic = 0.0
+            for j in range(academic_parts.shape[1]):
+                academic += academic_parts[i, j]
+            campus = 0.0
+            for j in range(campus_parts.shape[1]):
+                campus += campus_parts[i, j]
+            campus /= campus_parts.shape[1]
+            social = 0.0
+            for j in range(social_parts.shape[1]):
+                social += social_parts[i, j]
+            social /= social_parts.shape[1]
+            out[i, 0] = (wa*academic + wc*campus + wso*social) / w_total
+            out[i, 1] = academic
+            out[i, 2] = campus
+            out[i, 3] = social
+        return out
+else:
+    score_traits = _score_traits_numpy
+    combine_scores = _combine_scores_numpy
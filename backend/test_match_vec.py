@@ -0,0 +1,134 @@
+"""
+Check the vectorized scorers against the per-program reference scorers.
+
+score_all_vec / compute_matches must give bit-identical scores and the same
+ranking as score_academic / score_campus / score_social, through both the
+numba kernels and their NumPy twins, and from freshly built as well as
+cached program arrays.
+
+Usage (from backend/):
+    python -m unittest test_match_vec
+"""
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BASE_DIR)
+# match_me loads program_profiles.json from the working directory at import
+os.chdir(BASE_DIR)
+
+import numpy as np
+
+import match_me
+import score_numba
+
+N_PAYLOADS = 25
+
+
+def random_answers(rng, programs):
+    """A quiz payload built from answer options and strings that occur in the program data"""
+    def pick(values, low=0, high=4):
+        return rng.sample(values, min(len(values), rng.randint(low, high)))
+
+    def strings(section, field):
+        return sorted({s for p in programs for s in p[section].get(field, [])})
+
+    likert = {key: rng.randint(1, 5) for key in ('LS', 'SP', 'CO', 'UR', 'CR', 'CE', 'ME', 'CP', 'NS', 'CEV')}
+    weights = {'wa': rng.choice([0, 0.2, 0.6, 1, rng.random()]),
+               'wc': rng.choice([0, 0.2, 1, rng.random()]),
+               'wso': rng.choice([0, 0.2, 1, rng.random()])}
+    if not any(weights.values()):
+        weights['wa'] = 1  # all-zero weights are rejected by parse_answers
+    return {
+        **likert,
+        **weights,
+        'AA': pick(strings('academic', 'interests') + list(match_me.INTEREST_MAPPINGS), 0, 6),
+        'LC': pick(strings('academic', 'liked_hs_courses') + list(match_me.COURSE_MAPPINGS), 0, 5),
+        'ALT': pick(strings('academic', 'alt_to_engineering'), 0, 3),
+        'CSB': rng.choice(match_me.CLASS_SIZE_ORDER + ['']),
+        'SET': rng.choice(['urban', 'suburban', 'small-town', 'rural', '']),
+        'HS': pick(strings('campus', 'housing_styles')),
+        'CPS': rng.choice(['small', 'medium', 'large', '']),
+        'SPT': pick(strings('social', 'sports')),
+        'CLB': pick(strings('social', 'clubs')),
+    }
+
+
+def reference_matches(answers):
+    """The per-program scoring loop the vectorized path replaced, ranked by a stable sort"""
+    # The reference scorers normalize HS/SPT/CLB themselves, so hand them the raw answers
+    user = dict(match_me.parse_answers(answers))
+    user.update(HS=set(answers['HS']), SPT=set(answers['SPT']), CLB=set(answers['CLB']))
+    results = []
+    for p in match_me.programs:
+        a = match_me.score_academic(p, user)
+        c = match_me.score_campus(p, user)
+        sos = match_me.score_social(p, user)
+        total = (user['wa']*a + user['wc']*c + user['wso']*sos) / user['W_TOTAL']
+        results.append((total, a, c, sos, p['uni'], p['program']))
+    results.sort(reverse=True, key=lambda x: x[0])
+    return results
+
+
+class VectorizedScoringTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        rng = random.Random(1234)
+        cls.payloads = [random_answers(rng, match_me.programs) for _ in range(N_PAYLOADS)]
+        cls.expected = [reference_matches(answers) for answers in cls.payloads]
+
+    def assert_matches_reference(self, prog):
+        for answers, expected in zip(self.payloads, self.expected):
+            user = match_me.parse_answers(answers)
+            scores = match_me.score_all_vec(prog, user)
+            ranked = [tuple(scores[i].tolist()) + prog['meta'][i]
+                      for i in match_me.top_indices(scores[:, 0])]
+            self.assertEqual(ranked, expected)
+
+    def test_compute_matches(self):
+        for answers, expected in zip(self.payloads, self.expected):
+            user = match_me.parse_answers(answers)
+            self.assertEqual(match_me.compute_matches(user, None), expected)
+            self.assertEqual(match_me.compute_matches(user), expected[:100])
+            self.assertEqual(match_me.compute_matches(user, 7), expected[:7])
+
+    def test_zero_weights_rejected(self):
+        with self.assertRaises(ValueError):
+            match_me.parse_answers({'wa': 0, 'wc': 0, 'wso': 0})
+
+    def test_top_indices_ranks_nan_last(self):
+        total = np.array([np.nan, 0.5, 0.9, np.nan, 0.5, 0.1])
+        full = match_me.top_indices(total)
+        self.assertEqual(full.tolist(), [2, 1, 4, 5, 0, 3])
+        for k in range(1, len(total) + 1):
+            self.assertEqual(match_me.top_indices(total, k).tolist(), full[:k].tolist())
+
+    @unittest.skipUnless(score_numba.NUMBA_AVAILABLE, "numba is not installed")
+    def test_numba_kernels(self):
+        self.assert_matches_reference(match_me._program_arrays())
+
+    def test_numpy_fallback(self):
+        saved = match_me.score_traits, match_me.combine_scores
+        match_me.score_traits = score_numba._score_traits_numpy
+        match_me.combine_scores = score_numba._combine_scores_numpy
+        try:
+            self.assert_matches_reference(match_me._program_arrays())
+        finally:
+            match_me.score_traits, match_me.combine_scores = saved
+
+    def test_cached_arrays(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_base = os.path.join(tmp, 'program_profiles')
+            built = match_me.get_program_arrays(match_me.programs, match_me.programs_version, cache_base)
+            key = match_me.program_arrays_key(match_me.programs_version)
+            loaded = match_me.load_program_arrays(cache_base, key)
+        self.assertIsNotNone(loaded)
+        self.assertEqual(set(loaded), set(built))
+        self.assert_matches_reference(loaded)
+
+
+if __name__ == '__main__':
+    unittest.main()